@@ -3,51 +3,91 @@ Core module for AugView - Pipeline tracking and decorator API
 """
 
 import base64
+import concurrent.futures
+import hashlib
 import io
+import os
+import threading
 import uuid
 import functools
 import inspect
 import random
 from typing import Any, Callable, Dict, List, Optional, Union
+from contextlib import contextmanager
+from enum import Enum
 from dataclasses import dataclass, field
 from PIL import Image
 import numpy as np
 
+# xxhash is much faster than any cryptographic hash for content hashing;
+# fall back to a truncated blake2b when it isn't installed
+try:
+    import xxhash
+
+    def _hash_buffer(data) -> int:
+        return xxhash.xxh3_64_intdigest(data)
+except ImportError:
+    def _hash_buffer(data) -> int:
+        return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+# numba fuses the range-detect + scale + cast of dtype normalization into a
+# single parallel pass; without it we fall back to plain numpy
+try:
+    from numba import njit, prange
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _normalize_to_uint8(img):
+        flat = img.ravel()
+        m = flat[0] * 0.0
+        for i in prange(flat.size):
+            m = max(m, flat[i])
+        scale = 255.0 if m <= 1.0 else 1.0
+        out = np.empty(flat.size, np.uint8)
+        for i in prange(flat.size):
+            out[i] = np.uint8(flat[i] * scale)
+        return out.reshape(img.shape)
+except ImportError:
+    def _normalize_to_uint8(img):
+        if img.max() <= 1.0:
+            return (img * 255).astype(np.uint8)
+        return img.astype(np.uint8)
+
 # Global viewer instance
 _current_viewer: Optional["AugView"] = None
 
+# Media types for the encoded image formats we produce
+_IMAGE_MEDIA_TYPES = {
+    "JPEG": "image/jpeg",
+    "PNG": "image/png",
+    "WEBP": "image/webp",
+}
 
-def convert_to_native(obj):
-    """Convert numpy types and other non-serializable types to Python native types for JSON serialization."""
-    from enum import Enum
-    
-    if obj is None:
-        return None
-    elif isinstance(obj, (str, int, float, bool)):
-        return obj
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif isinstance(obj, (np.bool_, np.bool8)):
-        return bool(obj)
-    elif isinstance(obj, (np.integer, np.int64, np.int32)):
-        return int(obj)
-    elif isinstance(obj, (np.floating, np.float64, np.float32)):
-        return float(obj)
-    elif isinstance(obj, Enum):
-        return obj.name  # Convert enum to its name string
-    elif isinstance(obj, dict):
-        return {str(k): convert_to_native(v) for k, v in obj.items()}
-    elif isinstance(obj, (list, tuple)):
-        return [convert_to_native(v) for v in obj]
-    elif hasattr(obj, '__dict__'):
-        # For objects with __dict__, try to serialize their attributes
-        return str(obj)
-    else:
-        # Fallback: convert to string representation
-        try:
-            return str(obj)
-        except:
-            return None
+# Step previews are lossy thumbnails; only the original needs to be lossless
+_PREVIEW_FORMAT = "WEBP"
+_PREVIEW_MAX_SIZE = 512
+
+# Common internal/method attributes that never hold user-facing parameters
+_INTERNAL_TRANSFORM_ATTRS = frozenset((
+    'get_params', 'get_transform_init_args', 'get_transform_init_args_names',
+    'apply', 'apply_to_mask', 'targets', 'additional_targets', 'replay_mode',
+    'save_key', 'id_', 'transforms', 'processors', 'available_keys',
+))
+
+# Per-class cache of parameter attribute names discovered by dir() scans
+_PARAM_ATTR_NAMES_CACHE: Dict[type, tuple] = {}
+
+# Reusable per-thread encode buffer, so repeated encodes don't churn the
+# allocator with freshly grown BytesIO objects
+_ENCODE_TLS = threading.local()
+
+
+def _get_encode_buffer() -> io.BytesIO:
+    buffer = getattr(_ENCODE_TLS, "buffer", None)
+    if buffer is None:
+        buffer = _ENCODE_TLS.buffer = io.BytesIO()
+    buffer.seek(0)
+    buffer.truncate()
+    return buffer
 
 
 def get_current_viewer() -> Optional["AugView"]:
@@ -55,6 +95,84 @@ def get_current_viewer() -> Optional["AugView"]:
     return _current_viewer
 
 
+def _encode_worker(data: bytes, shape: tuple, dtype: str, fmt: str, max_size: int) -> bytes:
+    """Encode an image in a worker process (must stay module-level, picklable)."""
+    image = np.frombuffer(data, dtype=dtype).reshape(shape)
+    return AugView.encode_image(image, fmt=fmt, max_size=max_size)
+
+
+@functools.lru_cache(maxsize=256)
+def _extract_param_specs_for_class(cls: type) -> Dict[str, Dict[str, Any]]:
+    """Build UI parameter specs for a transform class (cached per class)."""
+    specs = {}
+
+    # Get from __init__ signature
+    try:
+        sig = inspect.signature(cls.__init__)
+        for param_name, param in sig.parameters.items():
+            if param_name in ('self', 'args', 'kwargs'):
+                continue
+
+            spec = {"name": param_name, "type": "unknown"}
+
+            # Special handling for probability 'p'
+            if param_name == 'p':
+                spec["type"] = "float"
+                spec["min"] = 0.0
+                spec["max"] = 1.0
+                spec["step"] = 0.05
+                spec["label"] = "Probability"
+                spec["is_probability"] = True
+
+            # Try to infer type from annotation or default
+            elif param.annotation != inspect.Parameter.empty:
+                anno = param.annotation
+                if anno == float or anno == Optional[float]:
+                    spec["type"] = "float"
+                    spec["min"] = 0.0
+                    spec["max"] = 1.0
+                    spec["step"] = 0.01
+                elif anno == int or anno == Optional[int]:
+                    spec["type"] = "int"
+                    spec["min"] = 0
+                    spec["max"] = 100
+                    spec["step"] = 1
+                elif anno == bool:
+                    spec["type"] = "bool"
+
+            if param.default != inspect.Parameter.empty:
+                # Enums go out by name (matching the params dicts); the wire
+                # encoders would otherwise serialize the member's raw value
+                if isinstance(param.default, Enum):
+                    spec["default"] = param.default.name
+                else:
+                    spec["default"] = param.default
+
+                # Infer type from default value
+                if isinstance(param.default, float):
+                    spec["type"] = "float"
+                    spec["min"] = 0.0
+                    spec["max"] = max(1.0, param.default * 2)
+                    spec["step"] = 0.01
+                elif isinstance(param.default, int) and not isinstance(param.default, bool):
+                    spec["type"] = "int"
+                    spec["min"] = 0
+                    spec["max"] = max(100, param.default * 2)
+                    spec["step"] = 1
+                elif isinstance(param.default, bool):
+                    spec["type"] = "bool"
+                elif isinstance(param.default, tuple) and len(param.default) == 2:
+                    spec["type"] = "range"
+                    spec["min"] = param.default[0]
+                    spec["max"] = param.default[1]
+
+            specs[param_name] = spec
+    except Exception:
+        pass
+
+    return specs
+
+
 @dataclass
 class TransformStep:
     """Represents a single step in the augmentation pipeline."""
@@ -63,26 +181,28 @@ class TransformStep:
     transform_type: str  # 'albumentations', 'torchvision', 'custom'
     params: Dict[str, Any]
     param_specs: Dict[str, Dict[str, Any]]  # Parameter specifications for UI
-    input_image: Optional[str] = None  # Base64 encoded
-    output_image: Optional[str] = None  # Base64 encoded
+    input_image: Optional[str] = None  # Image ID (see AugView._store_image)
+    output_image: Optional[str] = None  # Image ID (see AugView._store_image)
     output_size: Optional[List[int]] = None  # [width, height]
     enabled: bool = True
     applied: bool = True  # Whether transform was actually applied (for probability)
     probability: Optional[float] = None  # The 'p' value if exists
+    in_oneof: bool = False  # True if nested inside a probabilistic container (OneOf)
     
     def to_dict(self) -> Dict:
         return {
             "id": self.id,
             "name": self.name,
             "transform_type": self.transform_type,
-            "params": convert_to_native(self.params),
-            "param_specs": convert_to_native(self.param_specs),
+            "params": self.params,
+            "param_specs": self.param_specs,
             "input_image": self.input_image,
             "output_image": self.output_image,
             "output_size": self.output_size,
             "enabled": bool(self.enabled),
             "applied": bool(self.applied),
             "probability": float(self.probability) if self.probability is not None else None,
+            "in_oneof": bool(self.in_oneof),
         }
 
 
@@ -92,9 +212,9 @@ class Pipeline:
     id: str
     name: str
     steps: List[TransformStep] = field(default_factory=list)
-    original_image: Optional[str] = None  # Base64 encoded
+    original_image: Optional[str] = None  # Image ID (see AugView._store_image)
     original_size: Optional[List[int]] = None  # [width, height]
-    final_image: Optional[str] = None  # Base64 encoded
+    final_image: Optional[str] = None  # Image ID (see AugView._store_image)
     final_size: Optional[List[int]] = None  # [width, height]
     
     def to_dict(self) -> Dict:
@@ -121,7 +241,27 @@ class AugView:
         )
         self._transforms = []
         self._update_callbacks: List[Callable] = []
+        self._suppress_notify = False
         self._last_image: Optional[np.ndarray] = None
+        # Encoded image payloads keyed by image ID: id -> (bytes, media_type).
+        # Steps and the pipeline reference images by ID; the server streams the
+        # raw bytes as binary WebSocket frames or serves them via /api/image.
+        self._image_store: Dict[str, tuple] = {}
+        # Lazily-encoded previews: id -> (array, fmt, max_size, media_type).
+        # Step previews land here and are only encoded when something actually
+        # requests them (typically the UI via /api/image).
+        self._lazy_images: Dict[str, tuple] = {}
+        # Content-hash dedup for _store_image: (buffer hash, fmt, max_size)
+        # -> image ID.
+        # Identical frames (disabled steps, transforms that didn't fire) reuse
+        # the already-encoded payload instead of paying another encode.
+        self._encode_cache: Dict[tuple, str] = {}
+        # Image encodes run in a process pool so they overlap with the
+        # transforms themselves and never stall the server's event loop.
+        # The pool is created lazily; on failure we fall back to inline encode.
+        self._encode_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self._encode_pool_broken = False
+        self._pending_encodes: List[tuple] = []
         
         global _current_viewer
         _current_viewer = self
@@ -132,110 +272,240 @@ class AugView:
     
     def _notify_update(self):
         """Notify all registered callbacks of pipeline update."""
+        if self._suppress_notify:
+            return
         for callback in self._update_callbacks:
             try:
                 callback(self.pipeline)
             except Exception as e:
                 print(f"Callback error: {e}")
+
+    @contextmanager
+    def batched_updates(self):
+        """Suppress per-call update notifications, emitting a single one on exit.
+
+        Usage:
+            with viewer.batched_updates():
+                viewer.update_step_param(...)
+                viewer.toggle_step(...)
+        """
+        self._suppress_notify = True
+        try:
+            yield self
+        finally:
+            self._suppress_notify = False
+            self._notify_update()
     
     @staticmethod
-    def image_to_base64(image: Union[Image.Image, np.ndarray], max_size: int = 1000, quality: int = 90) -> str:
-        """Convert image to base64 string with optimization for speed."""
+    def _encode_to_buffer(image: Union[Image.Image, np.ndarray], fmt: str,
+                          max_size: int, quality: int) -> io.BytesIO:
+        """Encode an image into the shared per-thread buffer.
+
+        The returned buffer is reused: its contents are only valid until the
+        next encode on the same thread, so callers must copy out promptly.
+        """
         if isinstance(image, np.ndarray):
-            # Handle different array shapes
-            if len(image.shape) == 2:
-                image = np.stack([image] * 3, axis=-1)
-            elif image.shape[-1] == 4:
-                image = image[:, :, :3]
-            image = Image.fromarray(image.astype(np.uint8))
-        
+            if image.dtype != np.uint8:
+                image = image.astype(np.uint8)
+            # Common case first: RGB goes straight to PIL untouched
+            if image.ndim == 3 and image.shape[-1] == 3:
+                image = Image.fromarray(image)
+            elif image.ndim == 2:
+                # PIL encodes grayscale natively; no need to fan out to RGB
+                image = Image.fromarray(image, mode="L")
+            else:
+                # RGBA (or wider): minimal copy to drop the extra channels
+                image = Image.fromarray(np.ascontiguousarray(image[..., :3]))
+
         # Resize if too large (for faster encoding and smaller payload)
         if max(image.size) > max_size:
             ratio = max_size / max(image.size)
             new_size = (int(image.size[0] * ratio), int(image.size[1] * ratio))
             image = image.resize(new_size, Image.LANCZOS)
-        
-        buffer = io.BytesIO()
-        # Use JPEG for faster encoding (5-10x faster than PNG)
-        image.save(buffer, format="JPEG", quality=quality, optimize=True)
-        return base64.b64encode(buffer.getvalue()).decode("utf-8")
-    
+
+        buffer = _get_encode_buffer()
+        if fmt == "JPEG":
+            image.save(buffer, format="JPEG", quality=quality, optimize=True)
+        elif fmt == "WEBP":
+            # method=0 favors encode speed over compression ratio
+            image.save(buffer, format="WEBP", quality=quality, method=0)
+        elif fmt == "PNG":
+            # Still lossless; zlib's default level 6 costs most of the encode
+            # time for no UI benefit
+            image.save(buffer, format="PNG", compress_level=1)
+        else:
+            image.save(buffer, format=fmt)
+        return buffer
+
+    @staticmethod
+    def encode_image(image: Union[Image.Image, np.ndarray], fmt: str = "JPEG",
+                     max_size: int = 1000, quality: int = 85) -> bytes:
+        """Encode an image to raw compressed bytes (JPEG by default)."""
+        return AugView._encode_to_buffer(image, fmt, max_size, quality).getvalue()
+
+    def _store_image(self, image: Union[Image.Image, np.ndarray], fmt: str = "JPEG",
+                     max_size: int = 1000) -> str:
+        """Encode an image, stash the bytes in the image store, return its ID.
+
+        Identical buffers (by content hash) are encoded only once per run.
+        """
+        cache_key = None
+        image_id = None
+        if isinstance(image, np.ndarray):
+            if not image.flags["C_CONTIGUOUS"]:
+                image = np.ascontiguousarray(image)
+            cache_key = (_hash_buffer(memoryview(image).cast("B")), fmt, max_size)
+            cached_id = self._encode_cache.get(cache_key)
+            if cached_id is not None:
+                if cached_id not in self._lazy_images:
+                    return cached_id
+                # The hit points at a lazily-registered preview (typically
+                # the final image matching the last step's output). This is
+                # the eager path, so promote the entry to a real encode
+                # under its existing ID — otherwise the final image is never
+                # pushed as a WebSocket frame.
+                self._lazy_images.pop(cached_id, None)
+                image_id = cached_id
+
+        if image_id is None:
+            image_id = uuid.uuid4().hex
+        media_type = _IMAGE_MEDIA_TYPES.get(fmt, "application/octet-stream")
+
+        submitted = False
+        if isinstance(image, np.ndarray) and not self._encode_pool_broken:
+            try:
+                if self._encode_pool is None:
+                    self._encode_pool = concurrent.futures.ProcessPoolExecutor(
+                        max_workers=os.cpu_count()
+                    )
+                future = self._encode_pool.submit(
+                    _encode_worker, image.tobytes(), image.shape, image.dtype.str,
+                    fmt, max_size,
+                )
+                self._pending_encodes.append(
+                    (image_id, media_type, future, image, fmt, max_size)
+                )
+                submitted = True
+            except Exception:
+                self._encode_pool_broken = True
+
+        if not submitted:
+            self._image_store[image_id] = (
+                self.encode_image(image, fmt=fmt, max_size=max_size),
+                media_type,
+            )
+        if cache_key is not None:
+            self._encode_cache[cache_key] = image_id
+        return image_id
+
+    def _finalize_encodes(self):
+        """Collect results from in-flight pool encodes into the image store."""
+        for image_id, media_type, future, image, fmt, max_size in self._pending_encodes:
+            try:
+                payload = future.result()
+            except Exception:
+                # Same fallback as the submit path: encode inline rather
+                # than leaving an ID in circulation with no bytes behind it.
+                try:
+                    payload = self.encode_image(image, fmt=fmt, max_size=max_size)
+                except Exception as e:
+                    print(f"Encode error: {e}")
+                    continue
+            self._image_store[image_id] = (payload, media_type)
+        self._pending_encodes.clear()
+
+    def _store_preview(self, image: Union[Image.Image, np.ndarray]) -> str:
+        """Store a lossy, size-bounded preview of an intermediate image."""
+        return self._store_image(image, fmt=_PREVIEW_FORMAT, max_size=_PREVIEW_MAX_SIZE)
+
+    def _store_lazy(self, image: np.ndarray) -> str:
+        """Register a step preview without encoding it yet.
+
+        The UI typically inspects only a couple of steps per run, so encoding
+        happens on first request (get_image) rather than eagerly for all 2N
+        step frames.
+        """
+        if not image.flags["C_CONTIGUOUS"]:
+            image = np.ascontiguousarray(image)
+        cache_key = (
+            _hash_buffer(memoryview(image).cast("B")),
+            _PREVIEW_FORMAT,
+            _PREVIEW_MAX_SIZE,
+        )
+        cached_id = self._encode_cache.get(cache_key)
+        if cached_id is not None:
+            return cached_id
+
+        image_id = uuid.uuid4().hex
+        # Copy: transforms commonly hand back reusable scratch buffers, and a
+        # live reference would let a later step (or a concurrent rerun during
+        # a threadpool encode) rewrite this preview. One memcpy is still far
+        # cheaper than the encode being deferred.
+        self._lazy_images[image_id] = (
+            image.copy(), _PREVIEW_FORMAT, _PREVIEW_MAX_SIZE,
+            _IMAGE_MEDIA_TYPES[_PREVIEW_FORMAT],
+        )
+        self._encode_cache[cache_key] = image_id
+        return image_id
+
+    def peek_image(self, image_id: str) -> Optional[tuple]:
+        """Look up (bytes, media_type) for an already-encoded image ID."""
+        return self._image_store.get(image_id)
+
+    def get_image(self, image_id: str) -> Optional[tuple]:
+        """Look up (bytes, media_type) for an image ID, encoding lazily-
+        registered previews on first request."""
+        stored = self._image_store.get(image_id)
+        if stored is not None:
+            return stored
+        # get, not pop: /api/image is served from a threadpool, so concurrent
+        # requests for a fresh lazy ID are normal. Leaving the entry in place
+        # until the result is stored keeps this idempotent — worst case two
+        # threads encode the same image once each, never a spurious miss.
+        lazy = self._lazy_images.get(image_id)
+        if lazy is None:
+            return None
+        image, fmt, max_size, media_type = lazy
+        stored = (self.encode_image(image, fmt=fmt, max_size=max_size), media_type)
+        self._image_store[image_id] = stored
+        self._lazy_images.pop(image_id, None)
+        return stored
+
+    @staticmethod
+    def bytes_to_image(data: bytes) -> np.ndarray:
+        """Decode compressed image bytes to a numpy array."""
+        image = Image.open(io.BytesIO(data))
+        # asarray wraps PIL's decode buffer without the extra copy np.array
+        # would make; callers that mutate take their own copy anyway
+        return np.asarray(image)
+
+    @staticmethod
+    def image_to_base64(image: Union[Image.Image, np.ndarray], max_size: int = 1000, quality: int = 90) -> str:
+        """Convert image to a base64 string (kept for external consumers)."""
+        buffer = AugView._encode_to_buffer(image, "JPEG", max_size, quality)
+        # getbuffer() avoids the getvalue() copy; b64 output is pure ASCII and
+        # the ascii codec decodes it faster than utf-8
+        return base64.b64encode(buffer.getbuffer()).decode("ascii")
+
     @staticmethod
     def base64_to_image(b64_string: str) -> np.ndarray:
         """Convert base64 string to numpy array."""
-        image_data = base64.b64decode(b64_string)
-        image = Image.open(io.BytesIO(image_data))
-        return np.array(image)
+        return AugView.bytes_to_image(base64.b64decode(b64_string))
     
     def _extract_param_specs(self, transform: Any) -> Dict[str, Dict[str, Any]]:
         """Extract parameter specifications from a transform for UI generation."""
-        specs = {}
-        
-        # Get from __init__ signature
-        try:
-            sig = inspect.signature(transform.__class__.__init__)
-            for param_name, param in sig.parameters.items():
-                if param_name in ('self', 'args', 'kwargs'):
-                    continue
-                
-                spec = {"name": param_name, "type": "unknown"}
-                
-                # Special handling for probability 'p'
-                if param_name == 'p':
-                    spec["type"] = "float"
-                    spec["min"] = 0.0
-                    spec["max"] = 1.0
-                    spec["step"] = 0.05
-                    spec["label"] = "Probability"
-                    spec["is_probability"] = True
-                
-                # Try to infer type from annotation or default
-                elif param.annotation != inspect.Parameter.empty:
-                    anno = param.annotation
-                    if anno == float or anno == Optional[float]:
-                        spec["type"] = "float"
-                        spec["min"] = 0.0
-                        spec["max"] = 1.0
-                        spec["step"] = 0.01
-                    elif anno == int or anno == Optional[int]:
-                        spec["type"] = "int"
-                        spec["min"] = 0
-                        spec["max"] = 100
-                        spec["step"] = 1
-                    elif anno == bool:
-                        spec["type"] = "bool"
-                
-                if param.default != inspect.Parameter.empty:
-                    spec["default"] = param.default
-                    
-                    # Infer type from default value
-                    if isinstance(param.default, float):
-                        spec["type"] = "float"
-                        spec["min"] = 0.0
-                        spec["max"] = max(1.0, param.default * 2)
-                        spec["step"] = 0.01
-                    elif isinstance(param.default, int) and not isinstance(param.default, bool):
-                        spec["type"] = "int"
-                        spec["min"] = 0
-                        spec["max"] = max(100, param.default * 2)
-                        spec["step"] = 1
-                    elif isinstance(param.default, bool):
-                        spec["type"] = "bool"
-                    elif isinstance(param.default, tuple) and len(param.default) == 2:
-                        spec["type"] = "range"
-                        spec["min"] = param.default[0]
-                        spec["max"] = param.default[1]
-                
-                specs[param_name] = spec
-        except Exception:
-            pass
-        
-        return specs
+        specs = _extract_param_specs_for_class(transform.__class__)
+        # Copy per step so callers can tweak specs without poisoning the cache
+        return {name: dict(spec) for name, spec in specs.items()}
     
     def _serialize_value(self, value: Any) -> Any:
         """Recursively serialize a value for JSON compatibility."""
         if value is None:
             return None
+        # Before the scalar check: IntEnum members are ints, but the UI shows
+        # enums by name, and orjson/msgspec would encode a raw member by value
+        if isinstance(value, Enum):
+            return value.name
         if isinstance(value, (int, float, bool, str)):
             return value
         if isinstance(value, (tuple, list)):
@@ -244,7 +514,12 @@ class AugView:
             return {k: self._serialize_value(v) for k, v in value.items() 
                     if isinstance(k, str) and not k.startswith('_')}
         if isinstance(value, np.ndarray):
-            return value.tolist()
+            # Small arrays (kernels, ranges, matrices) are genuinely useful in
+            # the UI; anything bigger would bloat every broadcast, so it gets
+            # a compact placeholder instead
+            if value.size <= 64:
+                return value.tolist()
+            return f"<ndarray shape={value.shape} dtype={value.dtype}>"
         if isinstance(value, np.integer):
             return int(value)
         if isinstance(value, np.floating):
@@ -257,38 +532,79 @@ class AugView:
         return None  # Skip non-serializable values
 
     def _get_transform_params(self, transform: Any) -> Dict[str, Any]:
-        """Extract current parameter values from a transform."""
-        params = {}
-        
-        # Common param names to prioritize
-        priority_attrs = ['p', 'scale', 'ratio', 'limit', 'shift', 'range', 'size', 
-                          'degrees', 'translate', 'brightness', 'contrast', 'saturation', 
-                          'hue', 'blur', 'sigma', 'kernel', 'alpha', 'strength', 'var']
-        
-        # Get stored attributes
-        for attr in dir(transform):
-            if attr.startswith('_'):
-                continue
-            # Skip if it's a common internal/method attribute
-            if attr in ('get_params', 'get_transform_init_args', 'get_transform_init_args_names',
-                        'apply', 'apply_to_mask', 'targets', 'additional_targets', 'replay_mode',
-                        'save_key', 'id_', 'transforms', 'processors', 'available_keys'):
-                continue
-            try:
-                value = getattr(transform, attr)
+        """Extract current parameter values from a transform.
+
+        Transforms keep their params as plain instance attributes, so the
+        fast path walks __dict__ directly instead of the full dir() scan
+        (which also enumerates every inherited method and descriptor).
+        Slotted or C-implemented transforms fall back to __slots__, then to
+        the cached dir() scan.
+        """
+        instance_dict = getattr(transform, "__dict__", None)
+        if instance_dict:
+            params = {}
+            for attr, value in instance_dict.items():
+                if attr.startswith('_') or attr in _INTERNAL_TRANSFORM_ATTRS:
+                    continue
                 if callable(value) or isinstance(value, type):
                     continue
-                    
                 serialized = self._serialize_value(value)
                 if serialized is not None:
-                    # Only include meaningful values
                     if not (isinstance(serialized, list) and len(serialized) == 0):
                         params[attr] = serialized
+            return params
+
+        slot_names = []
+        for klass in type(transform).__mro__:
+            slots = klass.__dict__.get("__slots__")
+            if slots is None:
+                continue
+            if isinstance(slots, str):
+                # A bare string declares a single slot, not one per char
+                slots = (slots,)
+            slot_names.extend(
+                attr for attr in slots
+                if not attr.startswith('_') and attr not in _INTERNAL_TRANSFORM_ATTRS
+            )
+        if slot_names:
+            return self._params_from_names(transform, tuple(slot_names))
+
+        names = _PARAM_ATTR_NAMES_CACHE.get(type(transform))
+        if names is None:
+            collected = []
+            for attr in dir(transform):
+                if attr.startswith('_') or attr in _INTERNAL_TRANSFORM_ATTRS:
+                    continue
+                try:
+                    value = getattr(transform, attr)
+                except Exception:
+                    continue
+                # Methods/classes live on the class, so filtering here holds
+                # for every instance of this type
+                if callable(value) or isinstance(value, type):
+                    continue
+                collected.append(attr)
+            names = tuple(collected)
+            _PARAM_ATTR_NAMES_CACHE[type(transform)] = names
+
+        return self._params_from_names(transform, names)
+
+    def _params_from_names(self, transform: Any, names: tuple) -> Dict[str, Any]:
+        """Serialize the named attributes of a transform into a params dict."""
+        params = {}
+        for attr in names:
+            try:
+                value = getattr(transform, attr)
             except Exception:
-                pass
-        
+                continue
+            serialized = self._serialize_value(value)
+            if serialized is not None:
+                # Only include meaningful values
+                if not (isinstance(serialized, list) and len(serialized) == 0):
+                    params[attr] = serialized
+
         return params
-    
+
     def _get_probability(self, transform: Any) -> Optional[float]:
         """Get the probability 'p' from a transform if it exists."""
         if hasattr(transform, 'p'):
@@ -328,27 +644,52 @@ class AugView:
         return step
     
     def wrap_compose(self, compose: Any) -> Any:
-        """Wrap an Albumentations Compose or similar pipeline."""
-        transforms = []
-        
-        # Extract transforms from Compose
-        if hasattr(compose, 'transforms'):
-            transforms = compose.transforms
-        elif hasattr(compose, 'transform'):
-            transforms = compose.transform.transforms if hasattr(compose.transform, 'transforms') else [compose.transform]
-        
-        for t in transforms:
-            self.add_transform(t)
-        
+        """Wrap an Albumentations Compose or similar pipeline.
+
+        Containers are flattened iteratively, so transforms nested inside
+        Compose/OneOf at any depth all land in the pipeline (the old
+        single-level unwrap silently dropped them). Leaves that sit inside a
+        OneOf are flagged so the UI can show they only run sometimes.
+        """
+        stack = [(compose, False)]
+        while stack:
+            node, in_oneof = stack.pop()
+            children = getattr(node, 'transforms', None)
+            if children is None:
+                # Wrapper objects expose the real pipeline via .transform
+                inner = getattr(node, 'transform', None)
+                if inner is not None:
+                    children = getattr(inner, 'transforms', None)
+                    if children is None:
+                        children = [inner]
+            if children is not None:
+                # OneOf applies exactly one child per run; everything below
+                # it inherits that uncertainty
+                child_in_oneof = in_oneof or type(node).__name__ == 'OneOf'
+                stack.extend((t, child_in_oneof) for t in reversed(children))
+            else:
+                step = self.add_transform(node)
+                step.in_oneof = in_oneof
+
         return compose
     
+    # Number of strided samples compared by _check_transform_applied
+    _APPLIED_CHECK_SAMPLES = 1024
+
     def _check_transform_applied(self, input_img: np.ndarray, output_img: np.ndarray) -> bool:
-        """Check if a transform was actually applied by comparing images."""
+        """Check if a transform was actually applied by comparing images.
+
+        Compares ~1k strided samples instead of a full-image float mean —
+        enough to catch any real transform without touching every pixel.
+        """
         if input_img.shape != output_img.shape:
             return True
-        # Quick check: compare a sample of pixels
-        diff = np.abs(input_img.astype(float) - output_img.astype(float)).mean()
-        return diff > 0.5  # Threshold for "different enough"
+        if input_img.dtype != output_img.dtype:
+            return True
+        a = input_img.reshape(-1)
+        b = output_img.reshape(-1)
+        stride = max(1, a.size // self._APPLIED_CHECK_SAMPLES)
+        return not np.array_equal(a[::stride], b[::stride])
     
     def process_image(self, image: Union[Image.Image, np.ndarray], pipeline_func: Optional[Callable] = None) -> np.ndarray:
         """Process an image through the pipeline and capture each step."""
@@ -357,22 +698,27 @@ class AugView:
         
         # Store for re-running
         self._last_image = image.copy()
-        
-        self.pipeline.original_image = self.image_to_base64(image)
+
+        # Drop payloads from the previous run; the update below re-references everything
+        self._image_store.clear()
+        self._lazy_images.clear()
+        self._encode_cache.clear()
+
+        # Original stays lossless (PNG); intermediate previews are lossy WebP
+        self.pipeline.original_image = self._store_image(image, fmt="PNG")
         self.pipeline.original_size = [image.shape[1], image.shape[0]]  # [width, height]
         current_image = image.copy()
-        
+
         for transform, step in self._transforms:
             # If step is disabled, skip it but keep input/output from previous
             if not step.enabled:
-                step.input_image = self.image_to_base64(current_image)
-                step.output_image = self.image_to_base64(current_image)
+                step.input_image = step.output_image = self._store_lazy(current_image)
                 step.output_size = [current_image.shape[1], current_image.shape[0]]  # [width, height]
                 step.applied = False
                 continue
-            
-            step.input_image = self.image_to_base64(current_image)
+
             input_for_comparison = current_image.copy()
+            step.input_image = self._store_lazy(input_for_comparison)
             
             try:
                 # Apply transform based on type
@@ -395,22 +741,21 @@ class AugView:
                     else:
                         current_image = result
                 
-                # Ensure proper dtype
+                # Ensure proper dtype (single fused pass when numba is present)
                 if current_image.dtype != np.uint8:
-                    if current_image.max() <= 1.0:
-                        current_image = (current_image * 255).astype(np.uint8)
-                    else:
-                        current_image = current_image.astype(np.uint8)
-                
+                    current_image = _normalize_to_uint8(current_image)
+
                 # Ensure 3 channels (some transforms may change this)
                 if len(current_image.shape) == 2:
-                    current_image = np.stack([current_image] * 3, axis=-1)
+                    current_image = np.ascontiguousarray(
+                        np.broadcast_to(current_image[..., None], current_image.shape + (3,))
+                    )
                 elif len(current_image.shape) == 3 and current_image.shape[-1] == 1:
                     current_image = np.repeat(current_image, 3, axis=-1)
                 elif len(current_image.shape) == 3 and current_image.shape[-1] == 4:
                     current_image = current_image[:, :, :3]
                 
-                step.output_image = self.image_to_base64(current_image)
+                step.output_image = self._store_lazy(current_image)
                 step.output_size = [current_image.shape[1], current_image.shape[0]]  # [width, height]
                 
                 # Check if transform was actually applied (for probability-based transforms)
@@ -422,8 +767,9 @@ class AugView:
                 step.output_size = None
                 step.applied = False
         
-        self.pipeline.final_image = self.image_to_base64(current_image)
+        self.pipeline.final_image = self._store_preview(current_image)
         self.pipeline.final_size = [current_image.shape[1], current_image.shape[0]]  # [width, height]
+        self._finalize_encodes()
         self._notify_update()
         
         return current_image
@@ -433,8 +779,12 @@ class AugView:
         if self._last_image is not None:
             return self.process_image(self._last_image)
         elif self.pipeline.original_image:
-            image = self.base64_to_image(self.pipeline.original_image)
-            return self.process_image(image)
+            # Cold path only: the raw array cache is gone (e.g. after a
+            # restart), so fall back to decoding the stored PNG once
+            # — process_image repopulates _last_image immediately.
+            stored = self.get_image(self.pipeline.original_image)
+            if stored is not None:
+                return self.process_image(self.bytes_to_image(stored[0]))
         return None
     
     def update_step_param(self, step_id: str, param_name: str, value: Any) -> bool:
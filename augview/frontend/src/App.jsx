@@ -7,6 +7,7 @@ import ReactFlow, {
     useEdgesState,
 } from 'reactflow'
 import 'reactflow/dist/style.css'
+import { decode as decodeMsgpack, ExtensionCodec } from '@msgpack/msgpack'
 import { Layers, Shuffle, Wifi, WifiOff } from 'lucide-react'
 
 import TransformNode from './components/nodes/TransformNode'
@@ -24,6 +25,38 @@ const edgeTypes = {
     animated: AnimatedEdge,
 }
 
+// All WebSocket frames are binary with a 1-byte frame type: message frames
+// carry a msgpack payload, image frames a fixed-width image ID followed by
+// the raw encoded image bytes (see server.py)
+const MESSAGE_FRAME = 0x01
+const IMAGE_FRAME = 0x02
+const IMAGE_ID_LENGTH = 32
+
+// Numpy arrays arrive as msgpack Ext 1 carrying [dtype, shape, raw bytes]
+const NUMPY_EXT_CODE = 1
+const NUMPY_DTYPES = {
+    '|u1': Uint8Array,
+    '|i1': Int8Array,
+    '<u2': Uint16Array,
+    '<i2': Int16Array,
+    '<u4': Uint32Array,
+    '<i4': Int32Array,
+    '<f4': Float32Array,
+    '<f8': Float64Array,
+}
+
+const extensionCodec = new ExtensionCodec()
+extensionCodec.register({
+    type: NUMPY_EXT_CODE,
+    encode: () => null,
+    decode: (data) => {
+        const [dtype, , raw] = decodeMsgpack(data)
+        const TypedArray = NUMPY_DTYPES[dtype]
+        if (!TypedArray) return null
+        return Array.from(new TypedArray(raw.buffer, raw.byteOffset, raw.byteLength / TypedArray.BYTES_PER_ELEMENT))
+    },
+})
+
 
 
 function App() {
@@ -32,6 +65,8 @@ function App() {
     const [loading, setLoading] = useState(true)
     const [isRunning, setIsRunning] = useState(false)
     const wsRef = useRef(null)
+    const imageUrlsRef = useRef({}) // image ID -> blob object URL
+    const [imageVersion, setImageVersion] = useState(0)
 
     const [nodes, setNodes, onNodesChange] = useNodesState([])
     const [edges, setEdges, onEdgesChange] = useEdgesState([])
@@ -60,6 +95,7 @@ function App() {
             const wsUrl = `${protocol}//${window.location.host}/ws`
 
             const ws = new WebSocket(wsUrl)
+            ws.binaryType = 'arraybuffer'
 
             ws.onopen = () => {
                 console.log('WebSocket connected')
@@ -68,7 +104,25 @@ function App() {
             }
 
             ws.onmessage = (event) => {
-                const message = JSON.parse(event.data)
+                let message = null
+                if (event.data instanceof ArrayBuffer) {
+                    const buffer = event.data
+                    const frameType = new Uint8Array(buffer, 0, 1)[0]
+                    if (frameType === IMAGE_FRAME) {
+                        const imageId = new TextDecoder().decode(buffer.slice(1, 1 + IMAGE_ID_LENGTH))
+                        const blob = new Blob([buffer.slice(1 + IMAGE_ID_LENGTH)])
+                        if (imageUrlsRef.current[imageId]) {
+                            URL.revokeObjectURL(imageUrlsRef.current[imageId])
+                        }
+                        imageUrlsRef.current[imageId] = URL.createObjectURL(blob)
+                        setImageVersion(v => v + 1)
+                        return
+                    }
+                    if (frameType !== MESSAGE_FRAME) return
+                    message = decodeMsgpack(new Uint8Array(buffer, 1), { extensionCodec })
+                } else {
+                    message = JSON.parse(event.data)
+                }
                 if (message.type === 'pipeline_update') {
                     setPipeline(message.data)
                     setIsRunning(false)
@@ -101,9 +155,9 @@ function App() {
     // Fetch initial pipeline state
     useEffect(() => {
         fetch('/api/pipeline')
-            .then(res => res.json())
+            .then(res => res.ok ? res.json() : null)
             .then(data => {
-                if (!data.error) {
+                if (data) {
                     setPipeline(data)
                 }
                 setLoading(false)
@@ -186,6 +240,12 @@ function App() {
         const newNodes = []
         const newEdges = []
 
+        // Resolve an image ID to a pushed blob URL, falling back to HTTP
+        const resolveImage = (imageId) => {
+            if (!imageId) return null
+            return imageUrlsRef.current[imageId] || `/api/image/${imageId}`
+        }
+
         // Layout constants
         const startX = 50
         const centerY = 120
@@ -238,7 +298,7 @@ function App() {
             position: getNodePosition('source', sourceDefaultPos),
             style: getNodeStyle('source', sourceSize),
             data: {
-                originalImage: pipeline.original_image,
+                originalImage: resolveImage(pipeline.original_image),
                 originalSize: pipeline.original_size,
                 onUpload: handleImageUpload,
             },
@@ -260,6 +320,7 @@ function App() {
                 style: getNodeStyle(step.id, stepSize), // Pass size for calculation
                 data: {
                     step,
+                    imageSrc: resolveImage(step.output_image),
                     onParamUpdate: handleParamUpdate,
                     onToggleStep: handleToggleStep,
                 },
@@ -278,7 +339,7 @@ function App() {
             position: getNodePosition('output', outputDefaultPos),
             style: getNodeStyle('output', outputSize),
             data: {
-                finalImage: pipeline.final_image,
+                finalImage: resolveImage(pipeline.final_image),
                 finalSize: pipeline.final_size,
             },
         })
@@ -328,7 +389,7 @@ function App() {
 
         setNodes(newNodes)
         setEdges(newEdges)
-    }, [pipeline, handleImageUpload, handleParamUpdate, handleToggleStep, setNodes, setEdges])
+    }, [pipeline, imageVersion, handleImageUpload, handleParamUpdate, handleToggleStep, setNodes, setEdges])
 
     const defaultViewport = useMemo(() => ({ x: 0, y: 0, zoom: 0.8 }), [])
 
@@ -25,7 +25,7 @@ function OutputNode({ data, selected }) {
                 {finalImage ? (
                     <>
                         <img
-                            src={`data:image/png;base64,${finalImage}`}
+                            src={finalImage}
                             alt="Output"
                             className="node-preview-image"
                         />
@@ -61,7 +61,7 @@ function SourceImageNode({ data, selected }) {
                 {originalImage ? (
                     <div className="source-image-container">
                         <img
-                            src={`data:image/png;base64,${originalImage}`}
+                            src={originalImage}
                             alt="Source"
                             className="node-preview-image"
                         />
@@ -4,7 +4,7 @@ import { Eye, EyeOff, Check, X, ZoomIn } from 'lucide-react'
 import ImageLightbox from '../ImageLightbox'
 
 function TransformNode({ data, selected }) {
-    const { step, onParamUpdate, onToggleStep } = data
+    const { step, imageSrc, onParamUpdate, onToggleStep } = data
     const [localParams, setLocalParams] = useState({})
     const [lightboxOpen, setLightboxOpen] = useState(false)
 
@@ -188,8 +188,6 @@ function TransformNode({ data, selected }) {
 
     if (!step) return null
 
-    const imageSrc = step.output_image ? `data:image/png;base64,${step.output_image}` : null
-
     return (
         <>
             <div className={`transform-node ${selected ? 'selected' : ''} ${!step.enabled ? 'disabled' : ''}`}>
@@ -3,6 +3,7 @@ FastAPI server for AugView - serves the web UI and handles API requests.
 """
 
 import asyncio
+import functools
 import json
 import os
 import webbrowser
@@ -13,38 +14,94 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, ORJSONResponse, Response
+import msgspec
+import orjson
 import uvicorn
 import numpy as np
-from enum import Enum
 
 from .core import get_current_viewer, AugView
 
 
-class SafeJSONEncoder(json.JSONEncoder):
-    """Custom JSON encoder that handles numpy types and enums."""
-    def default(self, obj):
-        if isinstance(obj, np.ndarray):
-            return obj.tolist()
-        elif isinstance(obj, (np.bool_, np.bool8)):
-            return bool(obj)
-        elif isinstance(obj, (np.integer, np.int64, np.int32)):
-            return int(obj)
-        elif isinstance(obj, (np.floating, np.float64, np.float32)):
-            return float(obj)
-        elif isinstance(obj, Enum):
-            return obj.name
-        elif hasattr(obj, '__dict__'):
-            return str(obj)
-        try:
-            return str(obj)
-        except:
-            return None
+def _json_default(obj):
+    """Last-resort fallback for types orjson doesn't serialize natively.
+
+    Enums never reach this hook — orjson encodes them by value before the
+    fallback is consulted — so members are converted to names at ingestion
+    (see AugView._serialize_value) rather than here.
+    """
+    try:
+        return str(obj)
+    except Exception:
+        return None
+
+
+def safe_json_dumps(data) -> bytes:
+    """Dump data to JSON bytes; numpy types are handled natively by orjson."""
+    return orjson.dumps(
+        data,
+        default=_json_default,
+        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+    )
+
+
+class AugViewJSONResponse(ORJSONResponse):
+    """ORJSONResponse that tolerates numpy types and enums in payloads."""
+
+    def render(self, content: Any) -> bytes:
+        return safe_json_dumps(content)
+
 
+# msgpack Ext code for numpy arrays; the payload is a msgpack-encoded
+# NumpyRep, so the array body is a single memcpy instead of a tolist() walk
+NUMPY_EXT_CODE = 1
+
+
+class NumpyRep(msgspec.Struct, array_like=True, gc=False):
+    """Wire representation of a numpy array: [dtype, shape, data]."""
+    dtype: str
+    shape: tuple
+    data: bytes
+
+
+_REP_ENCODER = msgspec.msgpack.Encoder()
+_REP_DECODER = msgspec.msgpack.Decoder(NumpyRep)
+
+
+def _msgpack_enc_hook(obj):
+    """Fallback for types msgspec doesn't handle natively (numpy).
+
+    As with _json_default, enums are encoded by value before this hook runs,
+    so name conversion happens at ingestion instead.
+    """
+    if isinstance(obj, np.ndarray):
+        if not obj.flags["C_CONTIGUOUS"]:
+            obj = np.ascontiguousarray(obj)
+        return msgspec.msgpack.Ext(
+            NUMPY_EXT_CODE,
+            _REP_ENCODER.encode(NumpyRep(obj.dtype.str, obj.shape, obj.data)),
+        )
+    if isinstance(obj, np.generic):
+        return obj.item()
+    try:
+        return str(obj)
+    except Exception:
+        return None
 
-def safe_json_dumps(data):
-    """Safely dump data to JSON using custom encoder."""
-    return json.dumps(data, cls=SafeJSONEncoder)
+
+def _msgpack_ext_hook(code: int, data: memoryview):
+    """Reconstruct numpy arrays from their Ext representation."""
+    if code == NUMPY_EXT_CODE:
+        rep = _REP_DECODER.decode(data)
+        return np.frombuffer(rep.data, dtype=rep.dtype).reshape(rep.shape)
+    return msgspec.msgpack.Ext(code, bytes(data))
+
+
+# msgpack encoder for WebSocket broadcasts (binary, far faster than json)
+MSGPACK_ENCODER = msgspec.msgpack.Encoder(enc_hook=_msgpack_enc_hook)
+
+# Matching decoder for Python-side consumers of the broadcast frames
+MSGPACK_DECODER = msgspec.msgpack.Decoder(ext_hook=_msgpack_ext_hook)
 
 # Store connected WebSocket clients
 connected_clients: Set[WebSocket] = set()
@@ -52,10 +109,16 @@ connected_clients: Set[WebSocket] = set()
 # Reference to the current viewer
 _server_viewer: Optional[AugView] = None
 
+# The server's event loop, captured at startup so pipeline callbacks fired
+# from worker threads can schedule broadcasts onto it
+_main_loop: Optional[asyncio.AbstractEventLoop] = None
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup/shutdown."""
+    global _main_loop
+    _main_loop = asyncio.get_running_loop()
     yield
 
 
@@ -63,7 +126,8 @@ app = FastAPI(
     title="AugView",
     description="Image Augmentation Pipeline Visualizer",
     version="0.1.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=AugViewJSONResponse,
 )
 
 # CORS middleware for development
@@ -76,30 +140,124 @@ app.add_middleware(
 )
 
 
+# All WebSocket frames are binary, prefixed with a 1-byte frame type:
+# message frames carry a msgpack-encoded payload, image frames carry a
+# fixed-width image ID header (uuid4().hex) followed by raw encoded bytes.
+MESSAGE_FRAME = b"\x01"
+IMAGE_FRAME = b"\x02"
+IMAGE_ID_LENGTH = 32
+
+
+def _collect_images(pipeline_data: Dict) -> Dict[str, bytes]:
+    """Gather the eagerly-encoded image payloads referenced by a pipeline dict.
+
+    Step previews are encoded lazily, so peek_image skips them here; clients
+    fetch those on demand from /api/image when a node is actually shown.
+    """
+    viewer = _server_viewer or get_current_viewer()
+    if not viewer:
+        return {}
+
+    image_ids = [pipeline_data.get("original_image"), pipeline_data.get("final_image")]
+    for step in pipeline_data.get("steps", []):
+        image_ids.append(step.get("input_image"))
+        image_ids.append(step.get("output_image"))
+
+    images = {}
+    for image_id in image_ids:
+        if image_id and image_id not in images:
+            stored = viewer.peek_image(image_id)
+            if stored is not None:
+                images[image_id] = stored[0]
+    return images
+
+
+def _build_frames(pipeline_data: Dict) -> List[bytes]:
+    """Serialize a pipeline update into its WebSocket frames exactly once."""
+    frames = [MESSAGE_FRAME + MSGPACK_ENCODER.encode({
+        "type": "pipeline_update",
+        "data": pipeline_data
+    })]
+    for image_id, data in _collect_images(pipeline_data).items():
+        frames.append(IMAGE_FRAME + image_id.encode("ascii") + data)
+    return frames
+
+
+# Frames from the most recent broadcast, replayed to newly connected clients
+# so the initial send skips re-serializing the pipeline
+_last_frames: Optional[List[bytes]] = None
+
+
+async def _send_frames(client: WebSocket, frames: List[bytes]):
+    for frame in frames:
+        await client.send_bytes(frame)
+
+
 async def broadcast_update(pipeline_data: Dict):
     """Broadcast pipeline update to all connected clients."""
+    global _last_frames
+    frames = _build_frames(pipeline_data)
+    _last_frames = frames
+
     if not connected_clients:
         return
-    
-    message = safe_json_dumps({
-        "type": "pipeline_update",
-        "data": pipeline_data
-    })
-    
+
     disconnected = set()
     for client in connected_clients:
         try:
-            await client.send_text(message)
+            await _send_frames(client, frames)
         except Exception:
             disconnected.add(client)
-    
+
     # Clean up disconnected clients
     connected_clients.difference_update(disconnected)
 
 
+# Broadcast coalescing: at most one broadcast in flight plus one pending,
+# no matter how fast UI events (slider drags) trigger pipeline updates.
+# Both variables are only touched from the event loop thread.
+_broadcast_task: Optional[asyncio.Task] = None
+_broadcast_pending = False
+
+
+async def _broadcast_latest():
+    """Broadcast the current pipeline state, looping once more if updates
+    arrived while a send was in flight."""
+    global _broadcast_pending
+    while True:
+        viewer = _server_viewer or get_current_viewer()
+        if viewer is None:
+            return
+        await broadcast_update(viewer.pipeline.to_dict())
+        if not _broadcast_pending:
+            return
+        _broadcast_pending = False
+
+
+def _schedule_broadcast():
+    """Schedule a broadcast of the latest state (event loop thread only)."""
+    global _broadcast_task, _broadcast_pending
+    if _broadcast_task is not None and not _broadcast_task.done():
+        _broadcast_pending = True
+        return
+    _broadcast_task = asyncio.ensure_future(_broadcast_latest())
+
+
 def on_pipeline_update(pipeline):
-    """Callback when pipeline is updated."""
-    asyncio.create_task(broadcast_update(pipeline.to_dict()))
+    """Callback when pipeline is updated (may fire from a worker thread)."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        if _main_loop is not None:
+            _main_loop.call_soon_threadsafe(_schedule_broadcast)
+        return
+    _schedule_broadcast()
+
+
+async def _run_blocking(func, *args):
+    """Run CPU-bound viewer work in a thread so the event loop stays live."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args))
 
 
 @app.websocket("/ws")
@@ -109,13 +267,11 @@ async def websocket_endpoint(websocket: WebSocket):
     connected_clients.add(websocket)
     
     try:
-        # Send initial pipeline state
+        # Send initial pipeline state, reusing the last broadcast if available
         viewer = _server_viewer or get_current_viewer()
         if viewer:
-            await websocket.send_text(safe_json_dumps({
-                "type": "pipeline_update",
-                "data": viewer.pipeline.to_dict()
-            }))
+            frames = _last_frames or _build_frames(viewer.pipeline.to_dict())
+            await _send_frames(websocket, frames)
         
         while True:
             # Keep connection alive and handle incoming messages
@@ -125,7 +281,8 @@ async def websocket_endpoint(websocket: WebSocket):
             if message.get("type") == "update_param":
                 viewer = _server_viewer or get_current_viewer()
                 if viewer:
-                    viewer.update_step_param(
+                    await _run_blocking(
+                        viewer.update_step_param,
                         message["step_id"],
                         message["param_name"],
                         message["value"]
@@ -133,15 +290,15 @@ async def websocket_endpoint(websocket: WebSocket):
             elif message.get("type") == "toggle_step":
                 viewer = _server_viewer or get_current_viewer()
                 if viewer:
-                    viewer.toggle_step(
+                    await _run_blocking(
+                        viewer.toggle_step,
                         message["step_id"],
                         message["enabled"]
                     )
             elif message.get("type") == "rerun":
                 viewer = _server_viewer or get_current_viewer()
-                if viewer and viewer.pipeline.original_image:
-                    image = viewer.base64_to_image(viewer.pipeline.original_image)
-                    viewer.process_image(image)
+                if viewer:
+                    await _run_blocking(viewer.rerun)
                     
     except WebSocketDisconnect:
         connected_clients.discard(websocket)
@@ -152,10 +309,7 @@ async def get_pipeline():
     """Get the current pipeline structure."""
     viewer = _server_viewer or get_current_viewer()
     if not viewer:
-        return JSONResponse(
-            status_code=404,
-            content={"error": "No pipeline registered"}
-        )
+        raise HTTPException(status_code=404, detail="No pipeline registered")
     return viewer.pipeline.to_dict()
 
 
@@ -173,6 +327,31 @@ async def get_step(step_id: str):
     raise HTTPException(status_code=404, detail="Step not found")
 
 
+@app.get("/api/image/{image_id}")
+def get_image(image_id: str):
+    """Serve the raw encoded bytes for an image ID.
+
+    Sync on purpose: first access to a lazy preview encodes it, and FastAPI
+    runs plain `def` endpoints in its threadpool so that never blocks the
+    event loop. IDs are content-addressed per run, so responses are immutable
+    and safe for the browser to cache indefinitely.
+    """
+    viewer = _server_viewer or get_current_viewer()
+    if not viewer:
+        raise HTTPException(status_code=404, detail="No pipeline registered")
+
+    stored = viewer.get_image(image_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    data, media_type = stored
+    return Response(
+        content=data,
+        media_type=media_type,
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
+
+
 @app.put("/api/step/{step_id}/params")
 async def update_step_params(step_id: str, params: Dict[str, Any]):
     """Update parameters for a specific step."""
@@ -219,7 +398,7 @@ async def upload_image(file: UploadFile = File(...)):
         image_array = np.array(image)
         
         # Process through pipeline
-        viewer.process_image(image_array)
+        await _run_blocking(viewer.process_image, image_array)
         
         return {"status": "ok", "pipeline": viewer.pipeline.to_dict()}
     except Exception as e:
@@ -235,10 +414,9 @@ async def rerun_pipeline():
     
     if not viewer.pipeline.original_image:
         raise HTTPException(status_code=400, detail="No image loaded")
-    
+
     try:
-        image = viewer.base64_to_image(viewer.pipeline.original_image)
-        viewer.process_image(image)
+        await _run_blocking(viewer.rerun)
         return {"status": "ok", "pipeline": viewer.pipeline.to_dict()}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -305,7 +483,7 @@ def start_server(
     _server_viewer = viewer or get_current_viewer()
     
     if _server_viewer:
-        _server_viewer.register_callback(lambda p: asyncio.create_task(broadcast_update(p.to_dict())))
+        _server_viewer.register_callback(on_pipeline_update)
     
     if open_browser:
         import threading
@@ -317,11 +495,31 @@ def start_server(
         threading.Thread(target=open_browser_delayed, daemon=True).start()
     
     print(f"\n🎨 AugView server starting at http://{host}:{port}\n")
-    
+
+    # Pin the fast implementations explicitly rather than trusting "auto"
+    # detection: uvloop for the event loop and httptools for HTTP parsing
+    # (both ship with uvicorn[standard]), falling back gracefully where
+    # they are unavailable (e.g. uvloop on Windows).
+    try:
+        import uvloop  # noqa: F401
+        loop_impl = "uvloop"
+    except ImportError:
+        loop_impl = "asyncio"
+    try:
+        import httptools  # noqa: F401
+        http_impl = "httptools"
+    except ImportError:
+        http_impl = "h11"
+
     uvicorn.run(
         "augview.server:app" if reload else app,
         host=host,
         port=port,
         reload=reload,
-        log_level="info"
+        log_level="info",
+        loop=loop_impl,
+        http=http_impl,
+        # Uploaded images arrive over the WebSocket/API as single frames;
+        # the default 16MB cap is too tight for large uncompressed inputs
+        ws_max_size=64 * 1024 * 1024,
     )
@@ -4,9 +4,17 @@ Transform adapters for different augmentation libraries.
 
 from typing import Any, Callable, Dict, List, Optional, Union
 from dataclasses import dataclass
+import inspect
+import weakref
 import numpy as np
 from PIL import Image
 
+# torch is only needed for the torchvision adapter's tensor fast path
+try:
+    import torch
+except ImportError:
+    torch = None
+
 
 @dataclass
 class TransformInfo:
@@ -17,6 +25,11 @@ class TransformInfo:
     params: Dict[str, Any]
 
 
+# Param attribute names per transform class, computed once on first sight so
+# later instances of the same class skip the reflective scan entirely
+_PARAM_ALLOWLIST_CACHE: Dict[type, tuple] = {}
+
+
 class BaseAdapter:
     """Base class for transform library adapters."""
     
@@ -24,76 +37,127 @@ class BaseAdapter:
         self.transform = transform
         self.name = self._get_name()
         self.params = self._extract_params()
-    
+        self._setters = self._build_setters()
+        self._param_specs_cache = self._build_param_specs()
+
     def _get_name(self) -> str:
         return self.transform.__class__.__name__
+
+    def _build_setters(self) -> Dict[str, Callable[[Any], None]]:
+        """Pre-bind one typed setter per known param.
+
+        Each slider tick then costs a dict lookup plus a direct store:
+        object.__setattr__ bypasses any validator machinery on the transform
+        class, which is safe here because the bound cast keeps the attribute
+        at its original type.
+        """
+        setters = {}
+        for name, value in self.params.items():
+            setters[name] = lambda v, n=name, c=type(value), o=self.transform: \
+                object.__setattr__(o, n, c(v))
+        return setters
     
     def _extract_params(self) -> Dict[str, Any]:
-        """Extract parameters from the transform."""
+        """Extract parameters from the transform.
+
+        Parameter names are discovered once per transform class (from the
+        instance __dict__, which holds a handful of entries, instead of the
+        full dir() listing with every inherited method) and cached, so
+        repeated adapters of the same class only read the known attrs.
+        """
+        allowlist = _PARAM_ALLOWLIST_CACHE.get(type(self.transform))
+        if allowlist is None:
+            instance_dict = getattr(self.transform, '__dict__', None)
+            if instance_dict:
+                candidates = instance_dict.items()
+            else:
+                # Slotted/C-implemented transforms: fall back to the dir() scan
+                def iter_dir():
+                    for attr in dir(self.transform):
+                        try:
+                            yield attr, getattr(self.transform, attr)
+                        except Exception:
+                            pass
+                candidates = iter_dir()
+            allowlist = tuple(
+                attr for attr, value in candidates
+                if not attr.startswith('_')
+                and not callable(value)
+                and isinstance(value, (int, float, bool, str, tuple, list))
+            )
+            _PARAM_ALLOWLIST_CACHE[type(self.transform)] = allowlist
+
         params = {}
-        for attr in dir(self.transform):
-            if not attr.startswith('_'):
-                try:
-                    value = getattr(self.transform, attr)
-                    if not callable(value) and isinstance(value, (int, float, bool, str, tuple, list)):
-                        params[attr] = value
-                except:
-                    pass
+        for attr in allowlist:
+            try:
+                value = getattr(self.transform, attr)
+            except Exception:
+                continue
+            if isinstance(value, (int, float, bool, str, tuple, list)):
+                params[attr] = value
         return params
     
     def apply(self, image: np.ndarray) -> np.ndarray:
         """Apply the transform to an image."""
         raise NotImplementedError
-    
+
+    def _build_param_specs(self) -> Dict[str, Dict[str, Any]]:
+        """Build parameter specifications for UI (once, at construction)."""
+        return {}
+
+    def get_param_specs(self) -> Dict[str, Dict[str, Any]]:
+        """Get parameter specifications for UI.
+
+        Specs depend only on the param types, which update_param preserves,
+        so the dict built at construction is reused for every UI poll; only
+        the 'default' entries are refreshed in place on updates.
+        """
+        return self._param_specs_cache
+
     def update_param(self, name: str, value: Any) -> bool:
         """Update a parameter value."""
+        setter = self._setters.get(name)
+        if setter is None:
+            return False
         try:
-            setattr(self.transform, name, value)
-            self.params[name] = value
-            return True
-        except:
+            setter(value)
+        except (TypeError, ValueError):
             return False
+        self.params[name] = value
+        spec = self._param_specs_cache.get(name)
+        if spec is not None:
+            spec['default'] = value
+        return True
 
 
 class AlbumentationsAdapter(BaseAdapter):
     """Adapter for Albumentations transforms."""
     
+    # Limit-type parameters that get special handling in the UI
+    LIMIT_ATTRS = ['limit', 'var_limit', 'brightness_limit', 'contrast_limit',
+                   'hue_shift_limit', 'sat_shift_limit', 'val_shift_limit',
+                   'rotate_limit', 'scale_limit', 'shift_limit']
+
     def _extract_params(self) -> Dict[str, Any]:
-        params = {}
-        
-        # Common Albumentations parameters
-        common_params = ['p', 'always_apply']
-        
-        for attr in dir(self.transform):
-            if attr.startswith('_'):
-                continue
-            try:
-                value = getattr(self.transform, attr)
-                if not callable(value) and isinstance(value, (int, float, bool, str, tuple, list)):
-                    params[attr] = value
-            except:
-                pass
-        
-        # Special handling for limit-type parameters
-        limit_attrs = ['limit', 'var_limit', 'brightness_limit', 'contrast_limit', 
-                       'hue_shift_limit', 'sat_shift_limit', 'val_shift_limit',
-                       'rotate_limit', 'scale_limit', 'shift_limit']
-        
-        for attr in limit_attrs:
-            if hasattr(self.transform, attr):
+        params = super()._extract_params()
+
+        for attr in self.LIMIT_ATTRS:
+            if attr not in params and hasattr(self.transform, attr):
                 params[attr] = getattr(self.transform, attr)
-        
+
         return params
     
     def apply(self, image: np.ndarray) -> np.ndarray:
         """Apply Albumentations transform."""
+        if image.ndim == 4:
+            # Albumentations transforms are single-image; map over the batch
+            return np.stack([self.apply(img) for img in image])
         result = self.transform(image=image)
         return result.get('image', image)
     
-    def get_param_specs(self) -> Dict[str, Dict[str, Any]]:
-        """Get parameter specifications for UI."""
+    def _build_param_specs(self) -> Dict[str, Dict[str, Any]]:
         specs = {}
-        
+
         # Probability parameter
         if 'p' in self.params:
             specs['p'] = {
@@ -145,24 +209,53 @@ class AlbumentationsAdapter(BaseAdapter):
 
 class TorchvisionAdapter(BaseAdapter):
     """Adapter for torchvision transforms."""
-    
+
+    def __init__(self, transform: Any):
+        super().__init__(transform)
+        # torchvision v2 transforms take tensors directly, so the PIL
+        # round-trip (two full-image copies per call) can be skipped
+        self._tensor_input = torch is not None and any(
+            'torchvision.transforms.v2' in cls.__module__
+            for cls in type(transform).__mro__
+        )
+
     def apply(self, image: np.ndarray) -> np.ndarray:
         """Apply torchvision transform."""
+        if image.ndim == 4:
+            return np.stack([self.apply(img) for img in image])
+        if self._tensor_input:
+            # from_numpy shares the buffer and permute is a view — no copy
+            # until the transform itself needs one
+            chw = torch.from_numpy(np.ascontiguousarray(image)).permute(2, 0, 1)
+            result = self.transform(chw)
+            if torch.is_tensor(result):
+                return self._tensor_to_hwc_uint8(result)
+            return np.array(result)
+
         pil_image = Image.fromarray(image)
         result = self.transform(pil_image)
-        
+
         # Handle tensor output
-        if hasattr(result, 'numpy'):
-            return (result.numpy() * 255).astype(np.uint8).transpose(1, 2, 0)
-        elif hasattr(result, 'permute'):
-            return (result.permute(1, 2, 0).numpy() * 255).astype(np.uint8)
-        else:
-            return np.array(result)
+        if torch is not None and torch.is_tensor(result):
+            return self._tensor_to_hwc_uint8(result)
+        return np.array(result)
+
+    @staticmethod
+    def _tensor_to_hwc_uint8(result: "torch.Tensor") -> np.ndarray:
+        """Convert a CHW tensor to a contiguous HWC uint8 array in one pass.
+
+        Scaling and the byte cast run in torch's vectorized kernels, so there
+        is no float64 NumPy temporary and no non-contiguous transpose left
+        for downstream code to copy. Integer tensors (e.g. from PILToTensor)
+        are already 0-255 and must not be rescaled.
+        """
+        if result.dtype.is_floating_point:
+            result = result.mul(255).clamp_(0, 255)
+        return result.to(torch.uint8).permute(1, 2, 0).contiguous().numpy()
     
-    def get_param_specs(self) -> Dict[str, Dict[str, Any]]:
-        """Get parameter specifications for UI."""
+    def _build_param_specs(self) -> Dict[str, Dict[str, Any]]:
         specs = {}
-        
+
         for key, value in self.params.items():
             if isinstance(value, float):
                 specs[key] = {
@@ -203,23 +296,38 @@ class TorchvisionAdapter(BaseAdapter):
 class CustomAdapter(BaseAdapter):
     """Adapter for custom transform functions."""
     
-    def __init__(self, transform: Callable, name: Optional[str] = None, 
+    def __init__(self, transform: Callable, name: Optional[str] = None,
                  params: Optional[Dict[str, Any]] = None):
         self.transform = transform
         self.name = name or (transform.__name__ if hasattr(transform, '__name__') else 'CustomTransform')
         self.params = params or {}
+        self._setters = self._build_setters()
+        self._param_specs_cache = self._build_param_specs()
+
+        # Numba-backed transforms (those exposing a _numba_kernel) JIT-compile
+        # on first call; trigger that now on a tiny dummy image so the cost is
+        # paid at registration time, not on the first real frame
+        if getattr(transform, '_numba_kernel', None) is not None:
+            try:
+                transform(np.zeros((1, 1, 3), dtype=np.uint8))
+            except Exception:
+                pass
     
     def apply(self, image: np.ndarray) -> np.ndarray:
-        """Apply custom transform."""
+        """Apply custom transform.
+
+        Accepts a single (H, W, C) image or a batched (N, H, W, C) array;
+        broadcast-friendly transforms process the whole batch in one NumPy
+        pass, amortizing Python dispatch across all N images.
+        """
         result = self.transform(image)
         if isinstance(result, dict):
             return result.get('image', image)
         return result
     
-    def get_param_specs(self) -> Dict[str, Dict[str, Any]]:
-        """Get parameter specifications for UI."""
+    def _build_param_specs(self) -> Dict[str, Dict[str, Any]]:
         specs = {}
-        
+
         for key, value in self.params.items():
             if isinstance(value, float):
                 specs[key] = {
@@ -249,15 +357,105 @@ class CustomAdapter(BaseAdapter):
         return specs
 
 
-def create_adapter(transform: Any) -> BaseAdapter:
-    """Create appropriate adapter based on transform type."""
+class FusedCustomAdapter(BaseAdapter):
+    """Adapter that runs a chain of custom transforms as a single step.
+
+    Each CustomAdapter in a sequence hands a full image to the next through
+    its own apply dispatch; fusing the chain threads one buffer through all
+    of them in a single call. Two ping-pong scratch buffers serve steps that
+    accept an ``out=`` keyword, capping allocations at two regardless of
+    chain length. Note this collapses the chain into one pipeline step, so
+    AugView's per-step previews only show the combined result — use it for
+    throughput, not for inspecting intermediates.
+    """
+
+    def __init__(self, steps: List[Callable], name: Optional[str] = None):
+        self.steps = list(steps)
+        self.transform = None
+        self.name = name or ' + '.join(
+            getattr(s, '__name__', type(s).__name__) for s in self.steps
+        )
+        self.params = {}
+        self._setters = {}
+        self._param_specs_cache = {}
+        self._takes_out = [self._accepts_out(step) for step in self.steps]
+        self._scratch_a = None
+        self._scratch_b = None
+
+    @staticmethod
+    def _accepts_out(step: Callable) -> bool:
+        try:
+            params = inspect.signature(step).parameters
+        except (TypeError, ValueError):
+            return False
+        out = params.get('out')
+        return out is not None and out.kind in (
+            inspect.Parameter.KEYWORD_ONLY,
+            inspect.Parameter.POSITIONAL_OR_KEYWORD,
+        )
+
+    def apply(self, image: np.ndarray) -> np.ndarray:
+        """Apply every fused step in sequence."""
+        if self._scratch_a is None or self._scratch_a.shape != image.shape \
+                or self._scratch_a.dtype != image.dtype:
+            self._scratch_a = np.empty_like(image)
+            self._scratch_b = np.empty_like(image)
+
+        current, spare = self._scratch_a, self._scratch_b
+        np.copyto(current, image)
+
+        for step, takes_out in zip(self.steps, self._takes_out):
+            if takes_out and spare.shape == current.shape \
+                    and spare.dtype == current.dtype:
+                result = step(current, out=spare)
+            else:
+                result = step(current)
+            if isinstance(result, dict):
+                result = result.get('image', current)
+            if result is spare:
+                # Step wrote into the spare buffer; swap roles for the next one
+                current, spare = spare, current
+            else:
+                # Step managed its own output (possibly a new shape)
+                current = result
+        return current
+
+
+# One adapter per transform instance: the reflective param scan runs once,
+# not on every UI poll. Weak values let adapters die with their transforms
+# (the adapter keeps its transform alive, so entries expire together).
+_ADAPTER_CACHE: "weakref.WeakValueDictionary" = weakref.WeakValueDictionary()
+
+# Adapter class resolved per transform type, so the module-name string probe
+# runs once per class instead of once per adapter creation
+_ADAPTER_CLASS_CACHE: Dict[type, type] = {}
+
+
+def _resolve_adapter_class(transform: Any) -> type:
     module = transform.__class__.__module__
-    
+
     if 'albumentations' in module:
-        return AlbumentationsAdapter(transform)
+        return AlbumentationsAdapter
     elif 'torchvision' in module:
-        return TorchvisionAdapter(transform)
+        return TorchvisionAdapter
     elif callable(transform):
-        return CustomAdapter(transform)
+        return CustomAdapter
     else:
         raise ValueError(f"Unsupported transform type: {type(transform)}")
+
+
+def create_adapter(transform: Any) -> BaseAdapter:
+    """Create (or reuse) the appropriate adapter for a transform."""
+    key = id(transform)
+    adapter = _ADAPTER_CACHE.get(key)
+    if adapter is not None and adapter.transform is transform:
+        return adapter
+
+    adapter_cls = _ADAPTER_CLASS_CACHE.get(type(transform))
+    if adapter_cls is None:
+        adapter_cls = _resolve_adapter_class(transform)
+        _ADAPTER_CLASS_CACHE[type(transform)] = adapter_cls
+
+    adapter = adapter_cls(transform)
+    _ADAPTER_CACHE[key] = adapter
+    return adapter
@@ -51,14 +51,13 @@ def main():
     
     # Create a sample image (or load your own)
     # For demo, create a gradient image
-    sample_image = np.zeros((512, 512, 3), dtype=np.uint8)
-    for i in range(512):
-        for j in range(512):
-            sample_image[i, j] = [
-                int(255 * i / 512),  # Red gradient
-                int(255 * j / 512),  # Green gradient
-                128                   # Constant blue
-            ]
+    i = np.arange(512, dtype=np.float32)[:, None]
+    j = np.arange(512, dtype=np.float32)[None, :]
+    sample_image = np.stack([
+        np.broadcast_to(255 * i / 512, (512, 512)),  # Red gradient
+        np.broadcast_to(255 * j / 512, (512, 512)),  # Green gradient
+        np.full((512, 512), 128, dtype=np.float32),  # Constant blue
+    ], axis=-1).astype(np.uint8)
     
     # You can also load an image from file:
     # sample_image = np.array(Image.open("your_image.jpg"))
@@ -6,22 +6,87 @@ This example demonstrates how to use AugView with custom transform functions.
 
 import numpy as np
 from PIL import Image
-import cv2  # Optional, for more complex transforms
 
 from augview import AugView, start_server
 
+# OpenCV is optional: its hand-tuned SIMD kernels back the fast paths below,
+# and PIL/NumPy equivalents take over when it is missing
+try:
+    import cv2
+    _HAVE_CV2 = True
+except ImportError:
+    _HAVE_CV2 = False
+
+# Numba is optional: when present, the per-pixel kernels below compile to
+# fused SIMD loops; without it the transforms fall back to plain NumPy
+try:
+    from numba import njit, prange
+    _HAVE_NUMBA = True
+except ImportError:
+    _HAVE_NUMBA = False
+
+if _HAVE_NUMBA:
+    @njit(parallel=True, cache=True)
+    def _grayscale_kernel(image):
+        h, w = image.shape[:2]
+        out = np.empty((h, w), dtype=np.uint8)
+        for i in prange(h):
+            for j in range(w):
+                g = (np.uint32(image[i, j, 0]) * 77
+                     + np.uint32(image[i, j, 1]) * 150
+                     + np.uint32(image[i, j, 2]) * 29) >> 8
+                out[i, j] = np.uint8(g)
+        return out
+
+    @njit(parallel=True, cache=True)
+    def _vignette_kernel(image, mask):
+        h, w, c = image.shape
+        out = np.empty_like(image)
+        for i in prange(h):
+            for j in range(w):
+                m = mask[i, j]
+                for k in range(c):
+                    out[i, j, k] = np.uint8(image[i, j, k] * m)
+        return out
+else:
+    _grayscale_kernel = None
+    _vignette_kernel = None
+
 
 class GrayscaleTransform:
     """Custom transform that converts image to grayscale."""
     
     def __init__(self, keep_channels: bool = True):
         self.keep_channels = keep_channels
-    
+        self._numba_kernel = _grayscale_kernel
+
     def __call__(self, image: np.ndarray) -> np.ndarray:
-        gray = np.mean(image, axis=2, keepdims=True).astype(np.uint8)
+        if _HAVE_CV2 and image.ndim == 3 and image.shape[2] == 3 \
+                and image.dtype == np.uint8:
+            # cvtColor does the BT.601 sum (and the GRAY2RGB broadcast) in
+            # one SIMD pass each — faster than any NumPy expression
+            gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+            if self.keep_channels:
+                return cv2.cvtColor(gray, cv2.COLOR_GRAY2RGB)
+            return gray
+
+        # The kernel is single-image; batched (N, H, W, C) input takes the
+        # NumPy path, which broadcasts over the leading axis unchanged
+        if self._numba_kernel is not None and image.ndim == 3:
+            gray = self._numba_kernel(image)
+        else:
+            # Fixed-point BT.601 luma: (77R + 150G + 29B) / 256, all in uint16
+            # lanes — no float64 intermediate like np.mean would allocate
+            rgb = image.astype(np.uint16)
+            gray = (
+                (rgb[..., 0] * 77 + rgb[..., 1] * 150 + rgb[..., 2] * 29) >> 8
+            ).astype(np.uint8)
         if self.keep_channels:
-            return np.repeat(gray, 3, axis=2)
-        return gray.squeeze()
+            # Broadcast-store into one output buffer instead of np.repeat
+            out = np.empty_like(image)
+            out[...] = gray[..., None]
+            return out
+        return gray
 
 
 class InvertTransform:
@@ -29,38 +94,108 @@ class InvertTransform:
     
     def __init__(self, strength: float = 1.0):
         self.strength = strength
-    
+        self._lut = None
+        self._lut_strength = None
+        self._scratch = None
+
+    def _get_scratch(self, image: np.ndarray) -> np.ndarray:
+        # One persistent output buffer per instance: repeated slider updates
+        # on same-shaped frames stop paying a fresh allocation per call
+        if self._scratch is None or self._scratch.shape != image.shape \
+                or self._scratch.dtype != image.dtype:
+            self._scratch = np.empty_like(image)
+        return self._scratch
+
     def __call__(self, image: np.ndarray) -> np.ndarray:
-        inverted = 255 - image
-        return (image * (1 - self.strength) + inverted * self.strength).astype(np.uint8)
+        if self.strength == 1.0:
+            # Full inversion needs no blend at all
+            return np.subtract(255, image, out=self._get_scratch(image))
+
+        if image.dtype != np.uint8:
+            # LUT indexing needs uint8 input; anything else keeps the
+            # original float blend
+            inverted = 255 - image
+            return (image * (1 - self.strength) + inverted * self.strength).astype(np.uint8)
+
+        # Partial blend: every output value depends only on the input value,
+        # so precompute a 256-entry fixed-point LUT and gather — no float
+        # promotion, no per-pixel arithmetic
+        if self._lut is None or self._lut_strength != self.strength:
+            s = int(round(self.strength * 256))
+            src = np.arange(256)
+            self._lut = ((src * (256 - s) + (255 - src) * s) >> 8).astype(np.uint8)
+            self._lut_strength = self.strength
+        return np.take(self._lut, image, out=self._get_scratch(image))
 
 
 class SepiaTransform:
     """Custom transform that applies sepia effect."""
-    
+
+    SEPIA_MATRIX = np.array([
+        [0.393, 0.769, 0.189],
+        [0.349, 0.686, 0.168],
+        [0.272, 0.534, 0.131]
+    ])
+
     def __init__(self, intensity: float = 0.8):
         self.intensity = intensity
-    
+        self._m_eff = None
+        self._m_eff_intensity = None
+        self._luts = None
+        self._scratch_f32 = None
+        self._scratch_u8 = None
+
+    def _effective_matrix(self) -> np.ndarray:
+        # The blend (1-intensity)*image + intensity*sepia is linear, so fold
+        # it into the 3x3 matrix once per intensity value instead of paying
+        # a second full-image pass per call
+        if self._m_eff is None or self._m_eff_intensity != self.intensity:
+            self._m_eff = (
+                (1 - self.intensity) * np.eye(3)
+                + self.intensity * self.SEPIA_MATRIX
+            ).astype(np.float32)
+            # For uint8 input the whole linear map is expressible as nine
+            # 256-entry LUTs (one per in/out channel pair): three gathers and
+            # two adds per output channel, no float matmul at all
+            self._luts = np.round(
+                self._m_eff[:, :, None] * np.arange(256)
+            ).astype(np.int16)
+            self._m_eff_intensity = self.intensity
+        return self._m_eff
+
     def __call__(self, image: np.ndarray) -> np.ndarray:
-        # Ensure image is (H, W, 3)
-        if len(image.shape) != 3 or image.shape[2] != 3:
+        # Ensure image is (..., 3) — works for single images and batches
+        if image.ndim < 3 or image.shape[-1] != 3:
             return image
-        
-        # Sepia matrix - apply per pixel
-        sepia_matrix = np.array([
-            [0.393, 0.769, 0.189],
-            [0.349, 0.686, 0.168],
-            [0.272, 0.534, 0.131]
-        ])
-        
-        # Reshape for matrix multiplication: (H*W, 3) @ (3, 3).T -> (H*W, 3)
-        h, w, c = image.shape
-        flat = image.reshape(-1, 3).astype(np.float32)
-        sepia = flat @ sepia_matrix.T
-        sepia = sepia.reshape(h, w, 3)
-        sepia = np.clip(sepia, 0, 255).astype(np.uint8)
-        
-        return (image * (1 - self.intensity) + sepia * self.intensity).astype(np.uint8)
+
+        matrix = self._effective_matrix()
+
+        # Reusable scratch buffers keep peak memory flat across slider updates
+        if self._scratch_u8 is None or self._scratch_u8.shape != image.shape:
+            self._scratch_f32 = None
+            self._scratch_u8 = np.empty(image.shape, dtype=np.uint8)
+        out_u8 = self._scratch_u8
+
+        if image.dtype == np.uint8:
+            # Gather path: all integer lanes, no floating point per pixel
+            luts = self._luts
+            r, g, b = image[..., 0], image[..., 1], image[..., 2]
+            for k in range(3):
+                acc = luts[k, 0][r]
+                acc += luts[k, 1][g]
+                acc += luts[k, 2][b]
+                np.clip(acc, 0, 255, out=acc)
+                out_u8[..., k] = acc
+            return out_u8
+
+        # Non-uint8 input: one fused einsum pass, clip in place, cast on store
+        if self._scratch_f32 is None:
+            self._scratch_f32 = np.empty(image.shape, dtype=np.float32)
+        out = self._scratch_f32
+        np.einsum('...c,kc->...k', image.astype(np.float32), matrix, out=out)
+        np.clip(out, 0, 255, out=out)
+        out_u8[...] = out
+        return out_u8
 
 
 class VignetteTransform:
@@ -69,32 +204,85 @@ class VignetteTransform:
     def __init__(self, strength: float = 0.5, radius: float = 0.8):
         self.strength = strength
         self.radius = radius
-    
+        self._cache = {}
+        self._scratch = None
+        self._scratch16 = None
+        self._numba_kernel = _vignette_kernel
+
+    def _get_masks(self, h: int, w: int) -> tuple:
+        # The masks are a pure function of shape and params, and the slider
+        # loop reuses the same shape over and over — memoize them
+        key = (h, w, self.radius, self.strength)
+        masks = self._cache.get(key)
+        if masks is None:
+            # float32 end to end: the operands and scalars are all float32,
+            # so no intermediate silently promotes to float64 (half the
+            # bytes moved, twice the SIMD lanes of the default dtype)
+            y = np.arange(h, dtype=np.float32)[:, None]
+            x = np.arange(w, dtype=np.float32)[None, :]
+            center_y = np.float32(h / 2)
+            center_x = np.float32(w / 2)
+
+            # Work with squared distance: the vignette formula only ever
+            # uses dist**2, so the per-pixel sqrt cancels out
+            d2 = (x - center_x) ** 2 + (y - center_y) ** 2
+            scale = np.float32(
+                self.strength
+                / ((center_x ** 2 + center_y ** 2) * max(self.radius, 0.1) ** 2)
+            )
+            mask = 1 - d2 * scale
+            np.clip(mask, 0, 1, out=mask)
+
+            # 8-bit quantization feeds the integer apply paths below;
+            # preview-quality output doesn't need more than 8 mask bits
+            mask8 = (mask * np.float32(255)).astype(np.uint8)
+            mask_rgb = cv2.cvtColor(mask8, cv2.COLOR_GRAY2RGB) if _HAVE_CV2 else None
+            masks = (mask, mask8, mask_rgb)
+            self._cache = {key: masks}
+        return masks
+
     def __call__(self, image: np.ndarray) -> np.ndarray:
         # Ensure image is at least 2D
         if len(image.shape) < 2:
             return image
-            
-        h, w = image.shape[:2]
-        
-        # Create vignette mask
-        y, x = np.ogrid[:h, :w]
-        center_y, center_x = h / 2, w / 2
-        
-        # Distance from center normalized
-        dist = np.sqrt((x - center_x) ** 2 + (y - center_y) ** 2)
-        max_dist = np.sqrt(center_x ** 2 + center_y ** 2)
-        dist = dist / max_dist
-        
-        # Create vignette
-        vignette = 1 - (dist / max(self.radius, 0.1)) ** 2 * self.strength
-        vignette = np.clip(vignette, 0, 1)
-        
-        # Handle different image shapes
-        if len(image.shape) == 3:
+
+        # Spatial dims sit last-but-one for (H, W), (H, W, C) and (N, H, W, C)
+        h, w = image.shape[-3:-1] if image.ndim >= 3 else image.shape
+        vignette, mask8, mask_rgb = self._get_masks(h, w)
+
+        if image.dtype == np.uint8:
+            if _HAVE_CV2 and image.ndim == 3 and image.shape[2] == 3:
+                # Saturating SIMD multiply; scale folds the /255 back in
+                return cv2.multiply(image, mask_rgb, scale=1.0 / 255.0)
+
+            if self._numba_kernel is not None and image.ndim == 3:
+                # Fused multiply + cast, no float temporary
+                return self._numba_kernel(image, vignette)
+
+            # Integer fallback: uint16 product, shift, cast — no float lanes
+            m = mask8[:, :, np.newaxis] if image.ndim >= 3 else mask8
+            if self._scratch16 is None or self._scratch16.shape != image.shape:
+                self._scratch16 = np.empty(image.shape, dtype=np.uint16)
+            # dtype= forces the uint16 ufunc loop; with two uint8 operands
+            # NumPy would otherwise multiply modulo 256 before widening
+            np.multiply(image, m, out=self._scratch16, dtype=np.uint16)
+            self._scratch16 >>= 8
+            if self._scratch is None or self._scratch.shape != image.shape \
+                    or self._scratch.dtype != np.uint8:
+                self._scratch = np.empty(image.shape, dtype=np.uint8)
+            self._scratch[...] = self._scratch16
+            return self._scratch
+
+        if image.ndim >= 3:
+            # (H, W, 1) broadcasts over channels and any leading batch axis
             vignette = vignette[:, :, np.newaxis]
-        
-        return (image * vignette).astype(np.uint8)
+
+        # Multiply with an explicit out= so the float product is cast on
+        # store instead of materialized as a full-image temporary
+        if self._scratch is None or self._scratch.shape != image.shape \
+                or self._scratch.dtype != image.dtype:
+            self._scratch = np.empty_like(image)
+        return np.multiply(image, vignette, out=self._scratch, casting='unsafe')
 
 
 class PixelateTransform:
@@ -107,16 +295,26 @@ class PixelateTransform:
         # Ensure block_size is at least 1
         block_size = max(1, int(self.block_size))
         
+        if image.ndim == 4:
+            # Resizing is inherently per-image; cv2.resize releases the GIL,
+            # so this loop also parallelizes cleanly across threads
+            return np.stack([self(img) for img in image])
+
         h, w = image.shape[:2]
-        
+
         # Downscale then upscale
         small_h = max(1, h // block_size)
         small_w = max(1, w // block_size)
-        
-        small = Image.fromarray(image).resize((small_w, small_h), Image.Resampling.NEAREST)
-        pixelated = small.resize((w, h), Image.Resampling.NEAREST)
-        
-        return np.array(pixelated)
+
+        # cv2.resize works on the ndarray directly (no PIL round-trip copies);
+        # INTER_AREA averages each block on the way down instead of sampling
+        # a single pixel, then INTER_NEAREST blows the blocks back up
+        if _HAVE_CV2:
+            small = cv2.resize(image, (small_w, small_h), interpolation=cv2.INTER_AREA)
+            return cv2.resize(small, (w, h), interpolation=cv2.INTER_NEAREST)
+
+        small = Image.fromarray(image).resize((small_w, small_h), Image.Resampling.BOX)
+        return np.asarray(small.resize((w, h), Image.Resampling.NEAREST))
 
 
 def main():
@@ -130,19 +328,15 @@ def main():
     viewer.add_transform(VignetteTransform(strength=0.6), name="Vignette")
     viewer.add_transform(PixelateTransform(block_size=4), name="Pixelate")
     
-    # Create a sample image with some patterns
-    sample_image = np.zeros((400, 400, 3), dtype=np.uint8)
-    
-    # Create a colorful pattern
-    for i in range(400):
-        for j in range(400):
-            # Checkerboard with gradient
-            checker = ((i // 40) + (j // 40)) % 2
-            sample_image[i, j] = [
-                int(200 * checker + 55 * (i / 400)),
-                int(100 + 155 * (j / 400)),
-                int(200 * (1 - checker) + 55 * ((i + j) / 800))
-            ]
+    # Create a sample image with some patterns: checkerboard with gradient
+    i = np.arange(400, dtype=np.float32)[:, None]
+    j = np.arange(400, dtype=np.float32)[None, :]
+    checker = ((i // 40) + (j // 40)) % 2
+    sample_image = np.stack([
+        200 * checker + 55 * (i / 400),
+        np.broadcast_to(100 + 155 * (j / 400), (400, 400)),
+        200 * (1 - checker) + 55 * ((i + j) / 800),
+    ], axis=-1).astype(np.uint8)
     
     # Process the image
     viewer.process_image(sample_image)
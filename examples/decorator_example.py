@@ -35,14 +35,13 @@ def main():
     viewer = pipeline._augview
     
     # Create a sample colorful image
-    sample_image = np.zeros((300, 400, 3), dtype=np.uint8)
-    for i in range(300):
-        for j in range(400):
-            sample_image[i, j] = [
-                int(255 * i / 300),
-                int(255 * j / 400),
-                int(255 * (i + j) / 700)
-            ]
+    i = np.arange(300, dtype=np.float32)[:, None]
+    j = np.arange(400, dtype=np.float32)[None, :]
+    sample_image = np.stack([
+        np.broadcast_to(255 * i / 300, (300, 400)),
+        np.broadcast_to(255 * j / 400, (300, 400)),
+        255 * (i + j) / 700,
+    ], axis=-1).astype(np.uint8)
     
     # Process and visualize
     viewer.process_image(sample_image)
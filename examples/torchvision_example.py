@@ -40,14 +40,13 @@ def main():
         viewer.add_transform(t)
     
     # Create a sample image
-    sample_image = np.zeros((512, 512, 3), dtype=np.uint8)
-    for i in range(512):
-        for j in range(512):
-            sample_image[i, j] = [
-                int(128 + 127 * np.sin(i / 30)),
-                int(128 + 127 * np.cos(j / 30)),
-                int(128 + 127 * np.sin((i + j) / 40))
-            ]
+    i = np.arange(512, dtype=np.float32)[:, None]
+    j = np.arange(512, dtype=np.float32)[None, :]
+    sample_image = np.stack([
+        np.broadcast_to(128 + 127 * np.sin(i / 30), (512, 512)),
+        np.broadcast_to(128 + 127 * np.cos(j / 30), (512, 512)),
+        128 + 127 * np.sin((i + j) / 40),
+    ], axis=-1).astype(np.uint8)
     
     # Process the image
     viewer.process_image(sample_image)